@@ -1,6 +1,8 @@
 from typing import Literal, Tuple, Dict, Any
 from dataclasses import dataclass, field
+import numpy as np
 import torch
+import torch.nn.functional as F
 from torchmetrics.image import StructuralSimilarityIndexMeasure
 from .vanilla_metrics import VanillaMetrics, VanillaMetricsImpl
 
@@ -26,6 +28,11 @@ class HasInverseDepthMetrics(VanillaMetrics):
 
     depth_output_key: str = "inverse_depth"
 
+    min_effective_weight: float = 1e-8
+    """
+    skip the depth loss calculation when its weight is lower than this value
+    """
+
     def instantiate(self, *args, **kwargs) -> "HasInverseDepthMetricsModule":
         return HasInverseDepthMetricsModule(self)
 
@@ -36,30 +43,28 @@ class HasInverseDepthMetricsModule(VanillaMetricsImpl):
     def setup(self, stage: str, pl_module):
         super().setup(stage, pl_module)
 
+        # precompute the weight of every step, `get_weight()` becomes a list lookup
+        weight_scheduler = self.config.depth_loss_weight
+        self._weight_table = (weight_scheduler.init * (weight_scheduler.final_factor ** np.linspace(0., 1., weight_scheduler.max_steps + 1))).tolist()
+
         if self.config.depth_loss_type == "l1":
-            self._get_inverse_depth_loss = self._depth_l1_loss
+            self._get_inverse_depth_loss = F.l1_loss
         elif self.config.depth_loss_type == "l1+ssim":
             self.depth_ssim = StructuralSimilarityIndexMeasure()
             self._get_inverse_depth_loss = self._depth_l1_and_ssim_loss
         elif self.config.depth_loss_type == "l2":
-            self._get_inverse_depth_loss = self._depth_l2_loss
+            self._get_inverse_depth_loss = F.mse_loss
         # elif self.config.depth_loss_type == "kl":
         #     self._get_inverse_depth_loss = self._depth_kl_loss
         else:
             raise NotImplementedError()
 
-    def _depth_l1_loss(self, a, b):
-        return torch.abs(a - b).mean()
-
     def _depth_l1_and_ssim_loss(self, a, b):
-        l1_loss = self._depth_l1_loss(a, b)
+        l1_loss = F.l1_loss(a, b)
         ssim_metric = self.depth_ssim(a[None, None, ...], b[None, None, ...])
 
         return (1 - self.config.depth_loss_ssim_weight) * l1_loss + self.config.depth_loss_ssim_weight * (1 - ssim_metric)
 
-    def _depth_l2_loss(self, a, b):
-        return ((a - b) ** 2).mean()
-
     def _depth_kl_loss(self, a, b):
         pass
 
@@ -87,13 +92,18 @@ class HasInverseDepthMetricsModule(VanillaMetricsImpl):
         return self._get_inverse_depth_loss(gt_inverse_depth, predicted_inverse_depth)
 
     def get_weight(self, step: int):
-        return self.config.depth_loss_weight.init * (self.config.depth_loss_weight.final_factor ** min(step / self.config.depth_loss_weight.max_steps, 1))
+        return self._weight_table[min(step, self.config.depth_loss_weight.max_steps)]
 
     def get_train_metrics(self, pl_module, gaussian_model, step: int, batch, outputs) -> Tuple[Dict[str, Any], Dict[str, bool]]:
         metrics, pbar = super().get_train_metrics(pl_module, gaussian_model, step, batch, outputs)
 
         d_reg_weight = self.get_weight(step)
-        d_reg = self.get_inverse_depth_metric(batch, outputs) * d_reg_weight
+        if d_reg_weight < self.config.min_effective_weight:
+            d_reg = torch.zeros((), device=batch[0].device)
+        else:
+            # the weight is applied after the reduction on purpose: scaling the unreduced difference
+            # would add a pass over the whole disparity map, while this is a single scalar multiplication
+            d_reg = self.get_inverse_depth_metric(batch, outputs) * d_reg_weight
 
         metrics["loss"] = metrics["loss"] + d_reg
         metrics["d_reg"] = d_reg
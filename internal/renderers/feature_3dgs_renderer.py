@@ -366,9 +366,9 @@ class ViewerOptions:
                         
                         Not performs well on finding object outside of current view.
                         """
-                        from internal.viewer.client import ClientThread
+                        from internal.viewer.client import Client
                         render_outputs = self.renderer.forward(
-                            viewpoint_camera=ClientThread.get_camera(
+                            viewpoint_camera=Client.get_camera(
                                 event.client.camera,
                                 self.viewer.max_res_when_moving.value,
                             ).to_device(self.viewer.device),
@@ -478,7 +478,7 @@ class ViewerOptions:
     def _setup_segment(self):
         viewer, server = self.viewer, self.server
 
-        from internal.viewer.client import ClientThread
+        from internal.viewer.client import Client
 
         def switch_to_segment_output():
             if self.viewer.viewer_renderer.output_type_dropdown.value.startswith("segment3d_") is False:
@@ -545,7 +545,7 @@ class ViewerOptions:
             switch_to_segment_output()
 
             max_res = viewer.max_res_when_static.value
-            camera = ClientThread.get_camera(
+            camera = Client.get_camera(
                 event.client.camera,
                 image_size=max_res,
             ).to_device(viewer.device)
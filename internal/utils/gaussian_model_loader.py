@@ -1,5 +1,7 @@
 import os
+import re
 import glob
+import inspect
 import torch
 from typing import Tuple
 from internal.models.gaussian import Gaussian
@@ -28,6 +30,9 @@ class GaussianModelLoader:
         "_features_extra": "gaussians.appearance_features",
     }
 
+    # e.g. "epoch=29-step=30000.ckpt"
+    checkpoint_iteration_pattern = re.compile(r"=(\d+)\.ckpt$")
+
     @staticmethod
     def search_load_file(model_path: str) -> str:
         # if a directory path is provided, auto search checkpoint or ply
@@ -38,15 +43,18 @@ class GaussianModelLoader:
         # find checkpoint with max iterations
         load_from = None
         previous_checkpoint_iteration = -1
-        for i in glob.glob(os.path.join(checkpoint_dir, "*.ckpt")):
-            try:
-                checkpoint_iteration = int(i[i.rfind("=") + 1:i.rfind(".")])
-            except Exception as err:
-                print("error occurred when parsing iteration from {}: {}".format(i, err))
-                continue
-            if checkpoint_iteration > previous_checkpoint_iteration:
-                previous_checkpoint_iteration = checkpoint_iteration
-                load_from = i
+        if os.path.isdir(checkpoint_dir) is True:
+            for entry in os.scandir(checkpoint_dir):
+                if entry.name.endswith(".ckpt") is False:
+                    continue
+                match = GaussianModelLoader.checkpoint_iteration_pattern.search(entry.name)
+                if match is None:
+                    print("error occurred when parsing iteration from {}".format(entry.path))
+                    continue
+                checkpoint_iteration = int(match.group(1))
+                if checkpoint_iteration > previous_checkpoint_iteration:
+                    previous_checkpoint_iteration = checkpoint_iteration
+                    load_from = entry.path
 
         # not a checkpoint can be found, search point cloud
         if load_from is None:
@@ -66,17 +74,22 @@ class GaussianModelLoader:
 
         return load_from
 
+    @staticmethod
+    def load_checkpoint_file(checkpoint_path: str) -> dict:
+        # memory-map the checkpoint if supported (PyTorch>=2.1),
+        # tensors are read from the file on demand, rather than loading the whole file into RAM first
+        if "mmap" in inspect.signature(torch.load).parameters:
+            return torch.load(checkpoint_path, map_location="cpu", mmap=True)
+        return torch.load(checkpoint_path, map_location="cpu")
+
     @staticmethod
     def filter_state_dict_by_prefix(state_dict, prefix: str, device=None):
         prefix_len = len(prefix)
-        new_state_dict = state_dict.__class__()
-        for name in state_dict:
-            if name.startswith(prefix):
-                state = state_dict[name]
-                if device is not None:
-                    state = state.to(device)
-                new_state_dict[name[prefix_len:]] = state
-        return new_state_dict
+        return state_dict.__class__(
+            (name[prefix_len:], state if device is None else state.to(device))
+            for name, state in state_dict.items()
+            if name.startswith(prefix)
+        )
 
     @classmethod
     def initialize_model_from_checkpoint(cls, checkpoint: dict, device):
@@ -136,7 +149,7 @@ class GaussianModelLoader:
         if eval_mode is True:
             stage = "validation"
 
-        checkpoint = torch.load(checkpoint_path, map_location="cpu")
+        checkpoint = cls.load_checkpoint_file(checkpoint_path)
 
         model = cls.initialize_model_from_checkpoint(checkpoint, device)
         renderer = cls.initialize_renderer_from_checkpoint(checkpoint, stage, device)
@@ -125,6 +125,17 @@ def getWorld2View2(R, t, translate=np.array([.0, .0, .0]), scale=1.0):
     return np.float32(Rt)
 
 
+def inverse_rigid_transform(transform: np.ndarray) -> np.ndarray:
+    """
+    Inverse a 4x4 rigid transform [R | t] in closed form, i.e. [R^T | -R^T t], without a general matrix inversion
+    """
+    R_inv = transform[:3, :3].T
+    inverse = np.eye(4, dtype=transform.dtype)
+    inverse[:3, :3] = R_inv
+    inverse[:3, 3] = -R_inv @ transform[:3, 3]
+    return inverse
+
+
 def getProjectionMatrix(znear, zfar, fovX, fovY):
     tanHalfFovY = math.tan((fovY / 2))
     tanHalfFovX = math.tan((fovX / 2))
@@ -1,32 +1,48 @@
+import numpy as np
 import torch
 
 
-def rotation_matrix(a, b):
-    """Compute the rotation matrix that rotates vector a to vector b.
+def rotation_matrix_numpy(a, b) -> np.ndarray:
+    """Compute the rotation matrix that rotates vector a to vector b, by the Rodrigues' formula.
 
     Args:
         a: The vector to rotate.
         b: The vector to rotate to.
     Returns:
-        The rotation matrix.
+        The rotation matrix, in float64.
     """
-    a = a / torch.linalg.norm(a)
-    b = b / torch.linalg.norm(b)
-    v = torch.cross(a, b)
-    c = torch.dot(a, b)
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    a = a / np.linalg.norm(a)
+    b = b / np.linalg.norm(b)
+    v = np.cross(a, b)
+    c = float(a @ b)
     # If vectors are exactly opposite, we add a little noise to one of them
     if c < -1 + 1e-8:
-        eps = (torch.rand(3) - 0.5) * 0.01
-        return rotation_matrix(a + eps, b)
-    s = torch.linalg.norm(v)
-    skew_sym_mat = torch.Tensor(
+        eps = (np.random.rand(3) - 0.5) * 0.01
+        return rotation_matrix_numpy(a + eps, b)
+    s = np.linalg.norm(v)
+    skew_sym_mat = np.array(
         [
             [0, -v[2], v[1]],
             [v[2], 0, -v[0]],
             [-v[1], v[0], 0],
         ]
     )
-    return torch.eye(3) + skew_sym_mat + skew_sym_mat @ skew_sym_mat * ((1 - c) / (s ** 2 + 1e-8))
+    return np.eye(3) + skew_sym_mat + skew_sym_mat @ skew_sym_mat * ((1 - c) / (s ** 2 + 1e-8))
+
+
+def rotation_matrix(a, b):
+    """Compute the rotation matrix that rotates vector a to vector b.
+
+    Args:
+        a: The vector to rotate.
+        b: The vector to rotate to.
+    Returns:
+        The rotation matrix.
+    """
+    # evaluated with numpy, only the result is converted to a tensor
+    return torch.from_numpy(rotation_matrix_numpy(a, b).astype(np.float32))
 
 
 def qvec2rot(q):
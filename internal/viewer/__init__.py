@@ -1,2 +1,2 @@
-from .client import ClientThread
+from .client import Client
 from .renderer import ViewerRenderer
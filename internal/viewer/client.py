@@ -1,30 +1,54 @@
 import time
-import threading
+import asyncio
 import traceback
+from concurrent.futures import Executor
 import numpy as np
 import torch
 import viser
-import viser.transforms as vtf
 from internal.cameras.cameras import Cameras
-from internal.utils.graphics_utils import fov2focal
+from internal.utils.colmap import qvec2rotmat
+from internal.utils.graphics_utils import fov2focal, inverse_rigid_transform
 
 
-class ClientThread(threading.Thread):
-    def __init__(self, viewer, renderer, client: viser.ClientHandle):
-        super().__init__()
+class Client:
+    """
+    The rendering loop of a viser client, running as a coroutine on the viewer's event loop.
+    Must be instantiated in the thread running that event loop.
+    """
+
+    IDLE_TIME_BEFORE_HIGH_RES: float = 0.2
+    """
+    switch to high resolution rendering if no new trigger is received within this many seconds
+    """
+
+    def __init__(self, viewer, renderer, client: viser.ClientHandle, render_executor: Executor):
         self.viewer = viewer
         self.renderer = renderer
         self.client = client
 
-        self.render_trigger = threading.Event()
+        self.loop = asyncio.get_running_loop()
+        # the blocking rendering is run by this executor, rather than blocking the event loop
+        self.render_executor = render_executor
+
+        # keep a host copy of the scene transform, avoid converting it on every frame
+        self.camera_transform = np.asarray(viewer.camera_transform, dtype=np.float64)
+
+        self.render_trigger = asyncio.Event()
 
         self.last_move_time = 0
 
         self.last_camera = None  # store camera information
 
+        # the camera used by the previous rendering, and the values it was built from
+        self.render_camera = None
+        self.render_camera_key = None
+
+        self.pinned_image_buffer = None  # page-locked host memory, receiving the rendered images
+
         self.state = "low"  # low or high render resolution
 
-        self.stop_client = False  # whether stop this thread
+        self.stop_client = False  # whether stop this client
+        self.task: asyncio.Task = None  # the task running `run()`
 
         if viewer.default_camera_position is not None:
             client.camera.position = np.asarray(viewer.default_camera_position)
@@ -38,7 +62,7 @@ class ClientThread(threading.Thread):
             with self.client.atomic():
                 self.last_camera = cam
                 self.state = "low"  # switch to low resolution mode when a new camera received
-                self.render_trigger.set()
+                self.trigger_render()
 
     @classmethod
     def get_camera(
@@ -56,25 +80,21 @@ class ClientThread(threading.Thread):
             image_width = image_size
             image_height = int(image_width / camera.aspect)
 
-        # get camera pose
-        R = vtf.SO3(wxyz=camera.wxyz)
-        R = R @ vtf.SO3.from_x_radians(np.pi)
-        R = torch.tensor(R.as_matrix())
-        pos = torch.tensor(camera.position, dtype=torch.float64)
-        c2w = torch.eye(4)
-        c2w[:3, :3] = R
-        c2w[:3, 3] = pos
+        # get camera pose, these tiny matrices are computed by numpy rather than torch to avoid per-op dispatch overhead.
+        # Converting viser's camera (OpenCV axes) to OpenGL/Blender ones (Y up, Z back), i.e. a rotation of pi around x axis,
+        # then changing them to COLMAP's (Y down, Z forward), both negate the Y and Z columns, so they cancel out.
+        wxyz = np.asarray(camera.wxyz, dtype=np.float64)
+        c2w = np.eye(4)
+        c2w[:3, :3] = qvec2rotmat(wxyz / np.linalg.norm(wxyz))
+        c2w[:3, 3] = camera.position
 
         if camera_transform is not None:
-            c2w = torch.matmul(camera_transform, c2w)
-
-        # change from OpenGL/Blender camera axes (Y up, Z back) to COLMAP (Y down, Z forward)
-        c2w[:3, 1:3] *= -1
+            c2w = np.asarray(camera_transform, dtype=np.float64) @ c2w
 
         # get the world-to-camera transform and set R, T
-        w2c = torch.linalg.inv(c2w)
-        R = w2c[:3, :3]
-        T = w2c[:3, 3]
+        w2c = inverse_rigid_transform(c2w)
+        R = torch.tensor(w2c[:3, :3], dtype=torch.float)
+        T = torch.tensor(w2c[:3, 3], dtype=torch.float)
 
         # construct camera
         fx = torch.tensor([fov2focal(camera.fov, max(image_width, image_height))], dtype=torch.float)
@@ -96,53 +116,106 @@ class ClientThread(threading.Thread):
 
         return camera
 
+    def get_render_camera(self, image_size: int):
+        """
+        Reuse the camera of the previous rendering if nothing it depends on changed,
+        e.g. re-rendering triggered by render options
+        """
+
+        client_camera = self.client.camera
+        appearance_id = self.viewer.get_appearance_id_value()
+        time_value = self.viewer.time_slider.value
+        camera_key = (
+            tuple(client_camera.wxyz),
+            tuple(client_camera.position),
+            client_camera.fov,
+            client_camera.aspect,
+            image_size,
+            tuple(appearance_id),
+            time_value,
+        )
+        if camera_key != self.render_camera_key:
+            self.render_camera = self.get_camera(
+                client_camera,
+                image_size=image_size,
+                appearance_id=appearance_id,
+                time_value=time_value,
+                camera_transform=self.camera_transform,
+            ).to_device(self.viewer.device)
+            self.render_camera_key = camera_key
+
+        return self.render_camera
+
     def render_and_send(self):
         with self.client.atomic():
             self.last_move_time = time.time()
 
             max_res, jpeg_quality = self.get_render_options()
-            camera = self.get_camera(
-                self.client.camera,
-                image_size=max_res,
-                appearance_id=self.viewer.get_appearance_id_value(),
-                time_value=self.viewer.time_slider.value,
-                camera_transform=self.viewer.camera_transform,
-            ).to_device(self.viewer.device)
+            camera = self.get_render_camera(max_res)
 
-        with torch.no_grad():
+        with torch.inference_mode():
             image = self.renderer.get_outputs(camera, scaling_modifier=self.viewer.scaling_modifier.value)
-            image = torch.clamp(image, max=1.)
-            image = torch.permute(image, (1, 2, 0))
+            # quantize on the device, so only 8-bit pixels are transferred to the host for encoding,
+            # the renderer output is a fresh tensor, so it is safe to be modified in-place
+            image = image.clamp_(min=0., max=1.).mul_(255.).to(torch.uint8)
+            # make the HWC image contiguous on the device, rather than letting the encoder copy it on the host
+            image = image.movedim(0, -1).contiguous()
             self.client.set_background_image(
-                image.cpu().numpy(),
+                self.copy_image_to_host(image),
                 format=self.viewer.image_format,
                 jpeg_quality=jpeg_quality,
             )
 
-    def run(self):
+    def copy_image_to_host(self, image: torch.Tensor) -> np.ndarray:
+        """
+        Copy the image into a reusable pinned buffer, which is faster than copying into a newly allocated pageable one.
+        The buffer can be reused by the next frame, since `set_background_image()` encodes the image before returning.
+        """
+
+        if image.is_cuda is False:
+            return image.numpy()
+
+        n_elements = image.numel()
+        if self.pinned_image_buffer is None or self.pinned_image_buffer.numel() < n_elements or self.pinned_image_buffer.dtype != image.dtype:
+            self.pinned_image_buffer = torch.empty((n_elements,), dtype=image.dtype, pin_memory=True)
+        host_image = self.pinned_image_buffer[:n_elements].view(image.shape)
+        host_image.copy_(image, non_blocking=True)
+        torch.cuda.current_stream(image.device).synchronize()
+
+        return host_image.numpy()
+
+    def trigger_render(self):
+        """
+        Notify the client to render, can be called from any thread
+        """
+
+        self.loop.call_soon_threadsafe(self.render_trigger.set)
+
+    async def run(self):
         while True:
-            trigger_wait_return = self.render_trigger.wait(0.2)  # TODO: avoid wasting CPU
-            # stop client thread?
+            # only wake up on timeout when a high resolution rendering is pending, otherwise wait until triggered
+            timeout = None
+            if self.state == "low" and self.last_camera is not None:
+                timeout = self.IDLE_TIME_BEFORE_HIGH_RES
+            try:
+                await asyncio.wait_for(self.render_trigger.wait(), timeout)
+                trigger_wait_return = True
+            except asyncio.TimeoutError:
+                trigger_wait_return = False
+            # stop client?
             if self.stop_client is True:
                 break
             if not trigger_wait_return:
-                # skip if camera is none
-                if self.last_camera is None:
-                    continue
-
                 # if we haven't received a trigger in a while, switch to high resolution
-                if self.state == "low":
-                    self.state = "high"  # switch to high resolution mode
-                    # skip rendering if resolution not higher
-                    if self.viewer.max_res_when_moving.value >= self.viewer.max_res_when_static.value and self.viewer.jpeg_quality_when_moving.value >= self.viewer.jpeg_quality_when_static.value:
-                        continue
-                else:
-                    continue  # skip if already in high resolution mode
+                self.state = "high"  # switch to high resolution mode
+                # skip rendering if resolution not higher
+                if self.viewer.max_res_when_moving.value >= self.viewer.max_res_when_static.value and self.viewer.jpeg_quality_when_moving.value >= self.viewer.jpeg_quality_when_static.value:
+                    continue
 
             self.render_trigger.clear()
 
             try:
-                self.render_and_send()
+                await self.loop.run_in_executor(self.render_executor, self.render_and_send)
             except Exception as err:
                 print("error occurred when rendering for client")
                 traceback.print_exc()
@@ -157,11 +230,13 @@ class ClientThread(threading.Thread):
 
     def stop(self):
         self.stop_client = True
-        # self.render_trigger.set()  # TODO: potential thread leakage?
+        self.trigger_render()  # wake the client up, it may be waiting without a timeout
 
     def _destroy(self):
-        print("client thread #{} destroyed".format(self.client.client_id))
+        print("client #{} destroyed".format(self.client.client_id))
         self.viewer = None
         self.renderer = None
         self.client = None
         self.last_camera = None
+        self.render_camera = None
+        self.pinned_image_buffer = None
@@ -121,6 +121,9 @@ class ViewerRenderer:
     def get_outputs(self, camera, scaling_modifier: float = 1.):
         render_type, output_info, output_processor = self.output_info
 
+        # NOTE: this call can not be captured as a CUDA graph, even for a fixed image size:
+        # the rasterizers allocate buffers according to the data-dependent number of Gaussian-tile intersections,
+        # which is read back to the host, and the Gaussians themselves may be changed by the edit/transform panels
         render_outputs = self.renderer(
             camera,
             self.gaussian_model,
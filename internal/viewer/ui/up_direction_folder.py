@@ -1,8 +1,7 @@
 import numpy as np
 import viser
 import viser.transforms as vtf
-import torch
-from internal.dataparsers.colmap_dataparser import ColmapDataParser
+from internal.utils.rotation import rotation_matrix_numpy
 
 
 class UpDirectionFolder:
@@ -16,10 +15,10 @@ class UpDirectionFolder:
 
         # calculate rotation from current up vector
         def calculate_up_rotation():
-            rotation_matrix_of_up_direction = ColmapDataParser.rotation_matrix(
-                torch.tensor(self.viewer.up_direction / np.linalg.norm(self.viewer.up_direction), dtype=torch.float),
-                torch.tensor([0., 0., 1.], dtype=torch.float),
-            ).T.numpy()
+            rotation_matrix_of_up_direction = rotation_matrix_numpy(
+                self.viewer.up_direction,
+                np.asarray([0., 0., 1.]),
+            ).T
             return vtf.SO3.from_matrix(rotation_matrix_of_up_direction)
 
 
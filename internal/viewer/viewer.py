@@ -1,7 +1,10 @@
 import os
 from pathlib import Path
-import time
 import json
+import signal
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Literal, List
 
 import numpy as np
@@ -13,7 +16,8 @@ import yaml
 from internal.renderers import VanillaRenderer
 from internal.utils.gaussian_model_loader import GaussianModelLoader
 from internal.utils.gaussian_model_editor import MultipleGaussianModelEditor
-from internal.viewer import ClientThread, ViewerRenderer
+from internal.utils.graphics_utils import inverse_rigid_transform
+from internal.viewer import Client, ViewerRenderer
 from internal.viewer.ui import populate_render_tab, TransformPanel, EditPanel
 from internal.viewer.ui.up_direction_folder import UpDirectionFolder
 
@@ -229,6 +233,11 @@ class Viewer:
             renderer = self._load_seganygs(seganygs)
             turn_off_edit_and_video_render_panel()
 
+        # the checkpoint is only used by the edit panel to save the edited model,
+        # release it otherwise, rather than keeping the copies of all the tensors in memory
+        if self.show_edit_panel is False and getattr(self, "checkpoint", None) is not None:
+            self.checkpoint = None
+
         # create renderer
         self.viewer_renderer = ViewerRenderer(
             model,
@@ -343,19 +352,18 @@ class Viewer:
         print("load {}".format(cameras_json_path))
         with open(cameras_json_path, "r") as f:
             cameras = json.load(f)
-        up = torch.zeros(3)
-        for i in cameras:
-            up += torch.tensor(i["rotation"])[:3, 1]
-        up = -up / torch.linalg.norm(up)
+        rotations = np.asarray([i["rotation"] for i in cameras], dtype=np.float32)
+        up = -rotations[:, :3, 1].sum(axis=0)
+        up /= np.linalg.norm(up)
 
         print("up vector = {}".format(up))
-        self.up_direction = up.numpy()
+        self.up_direction = up
 
         return transform
 
         # rotation = rotation_matrix(up, torch.Tensor([0, 0, 1]))
         # transform[:3, :3] = rotation
-        # transform = torch.linalg.inv(transform)
+        # transform = torch.from_numpy(inverse_rigid_transform(transform.numpy()))
         #
         # return transform
 
@@ -371,7 +379,7 @@ class Viewer:
 
         self.camera_handles = []
 
-        camera_pose_transform = np.linalg.inv(self.camera_transform.cpu().numpy())
+        camera_pose_transform = inverse_rigid_transform(self.camera_transform.cpu().numpy())
         for camera in self.camera_poses:
             name = camera["img_name"]
             c2w = np.eye(4)
@@ -647,7 +655,7 @@ class Viewer:
                     self,
                     self.model_paths,
                     Path("./"),
-                    orientation_transform=torch.linalg.inv(self.camera_transform).cpu().numpy(),
+                    orientation_transform=inverse_rigid_transform(self.camera_transform.cpu().numpy()),
                     enable_transform=self.enable_transform,
                     background_color=self.background_color,
                     sh_degree=self.sh_degree,
@@ -657,13 +665,43 @@ class Viewer:
         if enable_renderer_options is True:
             self.viewer_renderer.renderer.setup_web_viewer_tabs(self, server, tabs)
 
+        # all the clients are driven by a single event loop, and their renderings are queued to a single worker thread
+        self.render_loop = asyncio.new_event_loop()
+        self.render_loop_thread = threading.Thread(target=self.render_loop.run_forever, daemon=True)
+        self.render_loop_thread.start()
+        self.render_executor = ThreadPoolExecutor(max_workers=1)
+
         # register hooks
         server.on_client_connect(self._handle_new_client)
         server.on_client_disconnect(self._handle_client_disconnect)
 
         if block is True:
-            while True:
-                time.sleep(999)
+            # block until SIGINT received, rather than waking up periodically
+            self._shutdown_event = threading.Event()
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGINT, lambda *_: self._shutdown_event.set())
+            self._shutdown_event.wait()
+            self.stop()
+
+    def stop(self):
+        """
+        Stop all the clients, the render loop and the viser server
+        """
+
+        clients = list(self.clients.values())
+        self.clients = {}
+        for i in clients:
+            i.stop()
+
+        async def wait_for_clients():
+            for i in clients:
+                await i.task
+
+        asyncio.run_coroutine_threadsafe(wait_for_clients(), self.render_loop).result()
+        self.render_loop.call_soon_threadsafe(self.render_loop.stop)
+        self.render_loop_thread.join()
+        self.render_executor.shutdown()
+        self._server.stop()
 
     def _handle_appearance_embedding_slider_updated(self, event: viser.GuiEvent):
         """
@@ -729,7 +767,7 @@ class Viewer:
         try:
             # switch to low resolution mode first, then notify the client to render
             self.clients[client_id].state = "low"
-            self.clients[client_id].render_trigger.set()
+            self.clients[client_id].trigger_render()
         except:
             # ignore errors
             pass
@@ -740,18 +778,22 @@ class Viewer:
 
     def _handle_new_client(self, client: viser.ClientHandle) -> None:
         """
-        Create and start a thread for every new client
+        Create a client and schedule its rendering loop on the render event loop
         """
 
-        # create client thread
-        client_thread = ClientThread(self, self.viewer_renderer, client)
-        client_thread.start()
-        # store this thread
-        self.clients[client.client_id] = client_thread
+        async def create_client():
+            # `Client` must be created in the event loop thread
+            viewer_client = Client(self, self.viewer_renderer, client, self.render_executor)
+            # keep a reference to the task, the event loop only holds a weak one
+            viewer_client.task = self.render_loop.create_task(viewer_client.run())
+            return viewer_client
+
+        # store this client
+        self.clients[client.client_id] = asyncio.run_coroutine_threadsafe(create_client(), self.render_loop).result()
 
     def _handle_client_disconnect(self, client: viser.ClientHandle):
         """
-        Destroy client thread when client disconnected
+        Stop client when client disconnected
         """
 
         try: